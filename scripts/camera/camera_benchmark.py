@@ -3,16 +3,38 @@
 # /// script
 # requires-python = ">=3.12"
 # dependencies = [
+#   "numpy",
 #   "opencv-python",
 # ]
 # ///
 
 import argparse
+import array
+import csv
+import itertools
 import json
+import os
+import queue
+import struct
+import sys
+import threading
 import time
+from dataclasses import dataclass
 from pathlib import Path
 
 import cv2
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    from linuxpy.video.device import BufferType as V4L2BufferType, Device as V4L2Device
+except ImportError:  # pragma: no cover - optional zero-copy backend
+    V4L2BufferType = None
+    V4L2Device = None
 
 
 PROFILE_FILE_DEFAULT = "camera_profiles.json"
@@ -35,9 +57,19 @@ FOURCC_OPTIONS = [
     "H264",  # Compressed H.264 stream (if supported)
 ]
 
+# Subset of the options above exercised by --sweep. Only combinations that
+# USB cameras commonly support are worth timing.
+SWEEP_FOURCCS = ("MJPG",)
+SWEEP_FPS = (30, 60, 120)
+
 AUTO_EXPOSURE_MANUAL = 1.0
 AUTO_EXPOSURE_AUTO = 3.0
 
+# Cadence of the interactive display/key-poll loop. Capture runs at camera
+# native rate on the grabber thread; pacing the GUI loop keeps waitKey's
+# ~1 ms sleep from imposing a ceiling on capture throughput.
+DISPLAY_REFRESH_HZ = 60.0
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
@@ -63,9 +95,15 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--backend",
         type=str,
-        choices=["any", "v4l2"],
+        choices=["any", "v4l2", "gstreamer-nvdec", "v4l2-direct"],
         default="v4l2",
-        help="Preferred capture backend (default: v4l2 on Linux, falls back to any if unavailable)",
+        help=(
+            "Preferred capture backend (default: v4l2 on Linux, falls back to any if unavailable). "
+            "'gstreamer-nvdec' decodes MJPG on an NVIDIA GPU via a GStreamer pipeline; "
+            "the format is fixed at open time, so the r/f/c cycling keys have no effect. "
+            "'v4l2-direct' (requires linuxpy) bypasses OpenCV and counts frames straight "
+            "from the kernel-mapped V4L2 buffers; plain --headless only."
+        ),
     )
     parser.add_argument(
         "--headless",
@@ -83,6 +121,39 @@ def parse_args() -> argparse.Namespace:
         default=10.0,
         help="Duration in seconds for headless benchmark (default: 10.0).",
     )
+    parser.add_argument(
+        "--hud-hz",
+        type=float,
+        default=0.0,
+        help=(
+            "Cap HUD refresh rate in the viewer (e.g. 15). 0 (default) renders "
+            "every frame. Lower values cut display-path memory bandwidth."
+        ),
+    )
+    parser.add_argument(
+        "--sweep-csv",
+        type=str,
+        default=None,
+        help="With --sweep, stream results to this CSV file and show only a progress line.",
+    )
+    parser.add_argument(
+        "--buffer-size",
+        type=int,
+        default=1,
+        help=(
+            "Driver frame queue depth (CAP_PROP_BUFFERSIZE). Default 1 so FPS "
+            "and latency measurements are not biased by stale queued frames."
+        ),
+    )
+    parser.add_argument(
+        "--decode-stride",
+        type=int,
+        default=0,
+        help=(
+            "In headless mode, decode (retrieve) only every Nth grabbed frame. "
+            "0 (default) never decodes, measuring the pure grab rate."
+        ),
+    )
     return parser.parse_args()
 
 
@@ -96,6 +167,8 @@ def load_profiles(path: Path) -> dict:
     if not path.exists():
         return {}
     try:
+        if orjson is not None:
+            return orjson.loads(path.read_bytes())
         with path.open("r", encoding="utf-8") as f:
             return json.load(f)
     except Exception as exc:  # pragma: no cover - defensive
@@ -104,10 +177,15 @@ def load_profiles(path: Path) -> dict:
 
 
 def save_profiles(path: Path, profiles: dict) -> None:
+    # orjson keeps the mid-stream save from visibly hiccupping the capture
+    # loop; stdlib json with indent+sort_keys is its slowest configuration.
     path.parent.mkdir(parents=True, exist_ok=True)
     tmp = path.with_suffix(path.suffix + ".tmp")
-    with tmp.open("w", encoding="utf-8") as f:
-        json.dump(profiles, f, indent=2, sort_keys=True)
+    if orjson is not None:
+        tmp.write_bytes(orjson.dumps(profiles, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
+    else:
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(profiles, f, indent=2, sort_keys=True)
     tmp.replace(path)
 
 
@@ -122,14 +200,63 @@ def make_default_settings(device_index: int, backend: str) -> dict:
     }
 
 
+# VideoWriter_fourcc crosses into C++ per call; the handful of format
+# strings this tool uses are worth memoizing.
+_FOURCC_CACHE: dict = {}
+
+_FOURCC_PACK = struct.Struct("<I").pack
+
+
 def fourcc_to_str(v: int) -> str:
     if v == 0:
         return "????"
-    chars = [chr((v >> (8 * i)) & 0xFF) for i in range(4)]
-    return "".join(chars)
+    # Little-endian pack matches the per-byte shift order; "replace" keeps
+    # garbage FOURCC values from raising on non-ASCII bytes.
+    return _FOURCC_PACK(v & 0xFFFFFFFF).decode("ascii", "replace")
+
 
+def read_actual_format(cap: cv2.VideoCapture) -> dict:
+    """Query the negotiated format once; each cap.get() is a V4L2 ioctl."""
+    return {
+        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        "fps": float(cap.get(cv2.CAP_PROP_FPS)),
+        "fourcc": fourcc_to_str(int(cap.get(cv2.CAP_PROP_FOURCC))),
+    }
+
+
+def build_nvdec_pipeline(device_index: int, settings: dict) -> str:
+    """GStreamer pipeline that keeps MJPG decode on an NVIDIA GPU (NVDEC).
+
+    Uses the Jetson-style nvv4l2decoder element; desktop installs with the
+    NVIDIA GStreamer plugins expose the same pipeline shape via nvjpegdec.
+    """
+    width = int(settings.get("width", 1280))
+    height = int(settings.get("height", 720))
+    fps = int(round(float(settings.get("fps", 30.0))))
+    return (
+        f"v4l2src device=/dev/video{device_index} "
+        f"! image/jpeg,width={width},height={height},framerate={fps}/1 "
+        "! nvv4l2decoder mjpeg=1 "
+        "! nvvidconv "
+        "! video/x-raw,format=BGRx "
+        "! videoconvert "
+        "! video/x-raw,format=BGR "
+        "! appsink drop=1 max-buffers=1"
+    )
 
-def open_capture(device_index: int, backend: str) -> cv2.VideoCapture:
+
+def open_capture(
+    device_index: int, backend: str, buffer_size: int = 1, settings: dict | None = None
+) -> cv2.VideoCapture:
+    if backend == "gstreamer-nvdec":
+        pipeline = build_nvdec_pipeline(device_index, settings or {})
+        cap = cv2.VideoCapture(pipeline, cv2.CAP_GSTREAMER)
+        if cap.isOpened():
+            return cap
+        print("[INFO] Failed to open NVDEC GStreamer pipeline, falling back to CAP_V4L2.")
+        cap.release()
+        backend = "v4l2"
     if backend == "v4l2":
         cap = cv2.VideoCapture(device_index, cv2.CAP_V4L2)
         if not cap.isOpened():
@@ -138,17 +265,28 @@ def open_capture(device_index: int, backend: str) -> cv2.VideoCapture:
             cap = cv2.VideoCapture(device_index)
     else:
         cap = cv2.VideoCapture(device_index)
+    if cap.isOpened() and buffer_size > 0:
+        # OpenCV defaults to a 4-frame V4L2 queue; a shallow queue keeps the
+        # measured FPS/latency honest instead of draining stale frames.
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
     return cap
 
 
-def apply_settings(cap: cv2.VideoCapture, settings: dict) -> dict:
+def drain_stale_frames(cap: cv2.VideoCapture, count: int = 3) -> None:
+    """Discard frames queued before the most recent settings change."""
+    for _ in range(count):
+        if not cap.grab():
+            break
+
+
+def apply_settings(cap: cv2.VideoCapture, settings: dict, quiet: bool = False) -> dict:
     width = int(settings.get("width", 0))
     height = int(settings.get("height", 0))
     fps = float(settings.get("fps", 0.0))
     fourcc_str = settings.get("fourcc")
 
     if fourcc_str:
-        fourcc = cv2.VideoWriter_fourcc(*fourcc_str)
+        fourcc = _FOURCC_CACHE.setdefault(fourcc_str, cv2.VideoWriter_fourcc(*fourcc_str))
         cap.set(cv2.CAP_PROP_FOURCC, fourcc)
 
     if width > 0:
@@ -158,26 +296,24 @@ def apply_settings(cap: cv2.VideoCapture, settings: dict) -> dict:
     if fps > 0:
         cap.set(cv2.CAP_PROP_FPS, fps)
 
-    actual = {
-        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
-        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
-        "fps": float(cap.get(cv2.CAP_PROP_FPS)),
-        "fourcc": fourcc_to_str(int(cap.get(cv2.CAP_PROP_FOURCC))),
-    }
+    actual = read_actual_format(cap)
 
-    print(
-        "[INFO] Applied settings -> requested: %dx%d @ %.1f FPS, %s; actual: %dx%d @ %.1f FPS, %s"
-        % (
-            width,
-            height,
-            fps,
-            fourcc_str,
-            actual["width"],
-            actual["height"],
-            actual["fps"],
-            actual["fourcc"],
+    if not quiet:
+        print(
+            "[INFO] Applied settings -> requested: %dx%d @ %.1f FPS, %s; actual: %dx%d @ %.1f FPS, %s"
+            % (
+                width,
+                height,
+                fps,
+                fourcc_str,
+                actual["width"],
+                actual["height"],
+                actual["fps"],
+                actual["fourcc"],
+            )
         )
-    )
+
+    drain_stale_frames(cap)
 
     return actual
 
@@ -238,10 +374,181 @@ def apply_profile_exposure(cap: cv2.VideoCapture, settings: dict) -> None:
             pass
 
 
-def overlay_info(frame, stats: dict, settings: dict, actual: dict):
-    overlay = frame.copy()
+@dataclass(slots=True)
+class Stats:
+    """Snapshot of the figures shown on the HUD.
+
+    Attribute access avoids the dict allocation and per-key hashing that a
+    fresh stats dict cost on every HUD refresh; settings/actual stay dicts
+    because they are the JSON (de)serialization form for profiles.
+    """
+
+    frame_count: int = 0
+    inst_fps: float = 0.0
+    ema_fps: float = 0.0
+    avg_fps: float = 0.0
+    mbps: float = 0.0
+
+
+class FrameStats:
+    """Frame-rate bookkeeping with O(1) per-frame cost.
+
+    Each captured frame only appends one integer timestamp; the
+    instantaneous/EMA/average FPS are recomputed from the buffered
+    timestamps in a single vectorized pass at HUD refresh time (~10 Hz)
+    instead of with per-frame Python float math.
+    """
+
+    BATCH = 256
+    REFRESH_NS = 100_000_000  # ~100 ms between recomputations
+    ALPHA = 0.1
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.frame_count = 0
+        self.session_start_ns = time.monotonic_ns()
+        self.inst_fps = 0.0
+        self.ema_fps = 0.0
+        self.avg_fps = 0.0
+        self._stamps = array.array("q")
+        self._last_refresh_ns = 0
+
+    def record(self, now_ns: int) -> None:
+        self.frame_count += 1
+        self._stamps.append(now_ns)
+        if len(self._stamps) >= 2 * self.BATCH:
+            del self._stamps[: -self.BATCH]
+
+    def maybe_refresh(self, now_ns: int) -> bool:
+        """Recompute FPS figures if the refresh interval has elapsed."""
+        if now_ns - self._last_refresh_ns < self.REFRESH_NS:
+            return False
+        self._last_refresh_ns = now_ns
+        if len(self._stamps) >= 2:
+            # Copy a snapshot rather than exporting the live buffer with
+            # np.frombuffer: record() runs on the grabber thread, and an
+            # append/trim while the buffer is exported raises BufferError
+            # there. The slice is a single C-level op under the GIL.
+            dts = np.diff(np.array(self._stamps[-self.BATCH:], dtype=np.int64))
+            dts = dts[dts > 0]
+            if dts.size:
+                fps = 1e9 / dts
+                self.inst_fps = float(fps[-1])
+                # Same alpha=0.1 EMA as before, applied across the batch in
+                # one dot product with precomputed decay weights.
+                decay = (1.0 - self.ALPHA) ** np.arange(fps.size - 1, -1, -1, dtype=np.float64)
+                seed = self.ema_fps if self.ema_fps > 0.0 else float(fps[0])
+                self.ema_fps = float(
+                    self.ALPHA * np.dot(decay, fps) + seed * (1.0 - self.ALPHA) ** fps.size
+                )
+        elapsed_ns = now_ns - self.session_start_ns
+        self.avg_fps = self.frame_count * 1e9 / elapsed_ns if elapsed_ns > 0 else 0.0
+        return True
+
+
+class FrameGrabber:
+    """Background thread that keeps draining the camera.
+
+    Without this, the USB transfer queue sits idle while the main loop
+    renders the HUD and pumps the GUI, costing delivered FPS. Frames are
+    retrieved into a small pre-allocated ring so the per-frame numpy
+    allocation (and hidden copy) disappears; only the buffer index crosses
+    the single-slot queue, and older indices are dropped. The consumer
+    must finish with a frame within RING_SIZE captures or risk seeing it
+    overwritten — fine for a display loop that only reads the newest frame.
+    Hold `lock` while calling cap.set()/cap.get() from other threads.
+    """
+
+    RING_SIZE = 3
+
+    def __init__(self, cap: cv2.VideoCapture, stats: FrameStats | None = None):
+        self._cap = cap
+        self._stats = stats
+        self._queue: queue.Queue = queue.Queue(maxsize=1)
+        self._buffers = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self.lock = threading.Lock()
+        self.failed = False
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            self._grab_loop()
+        except Exception as exc:
+            # A crash here must be visible to the consumer, which polls
+            # `failed` to tell a dead grabber from a momentarily empty queue.
+            print(f"[WARN] Grabber thread crashed: {exc}")
+            self.failed = True
+
+    def _grab_loop(self) -> None:
+        idx = 0
+        while not self._stop.is_set():
+            with self.lock:
+                if not self._cap.grab():
+                    self.failed = True
+                    break
+                if self._buffers is not None:
+                    ok, frame = self._cap.retrieve(self._buffers[idx])
+                else:
+                    ok, frame = self._cap.retrieve()
+            if not ok:
+                continue
+            if self._stats is not None:
+                # Count frames where they are captured, not where they are
+                # displayed — the GUI loop runs at its own (slower) cadence.
+                self._stats.record(time.monotonic_ns())
+            if self._buffers is None or frame is not self._buffers[idx]:
+                # First frame, or the format changed and OpenCV handed back
+                # a freshly allocated array: rebuild the ring at this size.
+                self._buffers = [frame] + [np.empty_like(frame) for _ in range(self.RING_SIZE - 1)]
+                idx = 0
+            ready = idx
+            idx = (idx + 1) % self.RING_SIZE
+            try:
+                self._queue.put_nowait(ready)
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+                try:
+                    self._queue.put_nowait(ready)
+                except queue.Full:
+                    pass
+
+    def read(self, timeout: float = 1.0):
+        try:
+            ready = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        return self._buffers[ready]
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=2.0)
+
 
-    lines = [
+def _opencl_available() -> bool:
+    """Whether the HUD composite can run through OpenCL (cached)."""
+    if _opencl_available._cached is None:
+        try:
+            _opencl_available._cached = bool(cv2.ocl.haveOpenCL() and cv2.ocl.useOpenCL())
+        except AttributeError:
+            _opencl_available._cached = False
+    return _opencl_available._cached
+
+
+_opencl_available._cached = None
+
+
+def build_static_hud_lines(settings: dict, actual: dict) -> list:
+    """Format the HUD lines that only change on settings events."""
+    return [
         f"Device {settings.get('device_index', '?')}  Backend: {settings.get('backend', 'any')}",
         (
             f"Requested: {settings.get('width')}x{settings.get('height')} @ {settings.get('fps'):.1f} FPS, "
@@ -251,32 +558,64 @@ def overlay_info(frame, stats: dict, settings: dict, actual: dict):
             f"Actual:    {actual.get('width')}x{actual.get('height')} @ {actual.get('fps'):.1f} FPS, "
             f"{actual.get('fourcc')}"
         ),
-        (
-            f"Frames: {stats['frame_count']}  Inst FPS: {stats['inst_fps']:.1f}  "
-            f"EMA FPS: {stats['ema_fps']:.1f}  Avg FPS: {stats['avg_fps']:.1f}"
-        ),
         (
             f"Exposure: mode={settings.get('auto_exposure', 'n/a')}  "
             f"exp={settings.get('exposure', 'n/a')}  "
             f"gain={settings.get('gain', 'n/a')}"
         ),
-        f"Est data rate: {stats['mbps']:.2f} Mbit/s (approx, assuming 3 bytes/pixel)",
         "Controls: q=quit  r=next res  f=next fps  c=next format  a=auto-exp  z/x=exp-/+  v/b=gain-/+  s=save profile  l=reload profile  h=help",
     ]
 
+
+def overlay_info(frame, stats: Stats, static_lines: list):
+    # Only the stats and data-rate lines are formatted per frame; the rest
+    # come pre-built from build_static_hud_lines.
+    lines = [
+        static_lines[0],
+        static_lines[1],
+        static_lines[2],
+        (
+            f"Frames: {stats.frame_count}  Inst FPS: {stats.inst_fps:.1f}  "
+            f"EMA FPS: {stats.ema_fps:.1f}  Avg FPS: {stats.avg_fps:.1f}"
+        ),
+        static_lines[3],
+        f"Est data rate: {stats.mbps:.2f} Mbit/s (approx, assuming 3 bytes/pixel)",
+        static_lines[4],
+    ]
+
     y0 = 20
     dy = 22
 
     hud_height = y0 + dy * len(lines) + 8
-    hud_height = min(hud_height, overlay.shape[0])
-    dark = overlay.copy()
-    cv2.rectangle(dark, (0, 0), (overlay.shape[1], hud_height), (0, 0, 0), -1)
-    cv2.addWeighted(dark, 0.7, overlay, 0.3, 0, overlay)
+    hud_height = min(hud_height, frame.shape[0])
+    width = frame.shape[1]
+
+    # With a usable OpenCL device, route the composite through UMat so the
+    # blend and text rendering run on the iGPU; imshow accepts UMat directly.
+    use_ocl = _opencl_available()
+
+    # Darken only the HUD strip, in place. A cached black strip avoids
+    # allocating (and copying) two full-resolution frames per render.
+    key = (hud_height, width, use_ocl)
+    dark = overlay_info._dark_cache.get(key)
+    if dark is None:
+        dark = np.zeros((hud_height, width, 3), dtype=np.uint8)
+        if use_ocl:
+            dark = cv2.UMat(dark)
+        overlay_info._dark_cache = {key: dark}
+
+    if use_ocl:
+        target = cv2.UMat(frame)
+        hud = cv2.UMat(target, (0, hud_height), (0, width))
+    else:
+        target = frame
+        hud = frame[:hud_height]
+    cv2.addWeighted(dark, 0.7, hud, 0.3, 0, dst=hud)
 
     for i, text in enumerate(lines):
         y = y0 + i * dy
         cv2.putText(
-            overlay,
+            target,
             text,
             (10, y),
             cv2.FONT_HERSHEY_SIMPLEX,
@@ -286,38 +625,94 @@ def overlay_info(frame, stats: dict, settings: dict, actual: dict):
             cv2.LINE_AA,
         )
 
-    return overlay
+    return target
+
+
+overlay_info._dark_cache = {}
+
+
+def _bench_inner(cap: cv2.VideoCapture, duration_ns: int, decode_stride: int) -> tuple:
+    """Timed hot loop of the headless benchmark.
 
+    Isolated so the bound methods and globals it touches can be hoisted to
+    locals once — at 1000+ FPS grab rates the remaining per-iteration cost
+    is attribute lookups and bytecode dispatch. (A compiled Cython/Numba
+    inner function was considered, but every iteration must re-enter
+    OpenCV's Python binding for grab() anyway, and this script is a
+    single-file uv script with no build step.)
+
+    Returns (frame_count, elapsed_seconds, ema_fps).
+    """
+    grab = cap.grab
+    retrieve = cap.retrieve
+    monotonic_ns = time.monotonic_ns
 
-def run_headless_benchmark(cap: cv2.VideoCapture, settings: dict, actual: dict, duration: float, quiet: bool = False):
     frame_count = 0
-    session_start = time.monotonic()
-    last_time = session_start
     ema_fps = 0.0
-    if not quiet:
-        print(f"[INFO] Starting headless benchmark for {duration:.1f} seconds")
+    # Per-frame float math is measurable at MJPG grab rates (1000+ FPS), so
+    # timestamps stay integer ns and the EMA updates once per batch.
+    ema_batch = 30
+    alpha = 0.1
+    session_start_ns = monotonic_ns()
+    last_ns = session_start_ns
     while True:
-        now = time.monotonic()
-        if now - session_start >= duration:
+        now_ns = monotonic_ns()
+        if now_ns - session_start_ns >= duration_ns:
             break
-        ret, frame = cap.read()
-        if not ret:
-            print("[WARN] Failed to read frame from camera.")
+        # grab() only advances the stream; retrieve() (the expensive
+        # JPEG/H.264 decode) runs on a stride so the measurement reflects
+        # the capture rate rather than decoder throughput.
+        if not grab():
+            print("[WARN] Failed to grab frame from camera.")
             break
+        if decode_stride and frame_count % decode_stride == 0:
+            ret, _frame = retrieve()
+            if not ret:
+                print("[WARN] Failed to retrieve frame from camera.")
+                break
         frame_count += 1
-        dt = now - last_time
-        last_time = now
-        inst_fps = 1.0 / dt if dt > 0 else 0.0
-        alpha = 0.1
-        ema_fps = inst_fps if ema_fps == 0.0 else (alpha * inst_fps + (1.0 - alpha) * ema_fps)
-    elapsed = time.monotonic() - session_start
+        if frame_count % ema_batch == 0:
+            dt_ns = now_ns - last_ns
+            last_ns = now_ns
+            inst_fps = ema_batch * 1_000_000_000 / dt_ns if dt_ns > 0 else 0.0
+            ema_fps = inst_fps if ema_fps == 0.0 else (alpha * inst_fps + (1.0 - alpha) * ema_fps)
+    elapsed = (monotonic_ns() - session_start_ns) / 1e9
+    return frame_count, elapsed, ema_fps
+
+
+def run_headless_benchmark(
+    cap: cv2.VideoCapture,
+    settings: dict,
+    actual: dict,
+    duration: float,
+    quiet: bool = False,
+    decode_stride: int = 0,
+):
+    if not quiet:
+        print(f"[INFO] Starting headless benchmark for {duration:.1f} seconds")
+    frame_count, elapsed, ema_fps = _bench_inner(cap, int(duration * 1e9), decode_stride)
     avg_fps = frame_count / elapsed if elapsed > 0 else 0.0
     width = actual.get("width", 0)
     height = actual.get("height", 0)
     mbps = 0.0
-    if width > 0 and height > 0 and avg_fps > 0:
-        bytes_per_frame = width * height * 3
-        mbps = (bytes_per_frame * avg_fps * 8.0) / 1e6
+    mbps_approx = False
+    if avg_fps > 0:
+        bitrate = 0.0
+        if hasattr(cv2, "CAP_PROP_BITRATE"):
+            bitrate = cap.get(cv2.CAP_PROP_BITRATE)
+        if bitrate > 0:
+            # CAP_PROP_BITRATE reports kbit/s where supported.
+            mbps = bitrate / 1e3
+        elif width > 0 and height > 0:
+            mbps_approx = True
+            if decode_stride:
+                # avg_fps is decode-bound here, so 3 bytes/pixel at that rate
+                # is a fair raw-equivalent figure. At stride 0 it is the grab
+                # rate of a (possibly compressed) stream, which overstates the
+                # data rate by orders of magnitude - leave the figure unset
+                # and let the sweep derive it from its decoded pass.
+                bytes_per_frame = width * height * 3
+                mbps = (bytes_per_frame * avg_fps * 8.0) / 1e6
 
     if quiet:
         return {
@@ -326,6 +721,7 @@ def run_headless_benchmark(cap: cv2.VideoCapture, settings: dict, actual: dict,
             "avg_fps": avg_fps,
             "ema_fps": ema_fps,
             "mbps": mbps,
+            "mbps_approx": mbps_approx,
         }
 
     print("[INFO] Headless benchmark results:")
@@ -334,55 +730,190 @@ def run_headless_benchmark(cap: cv2.VideoCapture, settings: dict, actual: dict,
     print(f"  Avg FPS:  {avg_fps:.2f}")
     print(f"  EMA FPS:  {ema_fps:.2f}")
     if mbps > 0:
-        print(f"  Approx data rate: {mbps:.2f} Mbit/s (assuming 3 bytes/pixel)")
+        if mbps_approx:
+            print(f"  Approx data rate: {mbps:.2f} Mbit/s (assuming 3 bytes/pixel)")
+        else:
+            print(f"  Data rate: {mbps:.2f} Mbit/s (reported by driver)")
+    elif mbps_approx:
+        print("  Data rate: n/a (driver reports no bitrate; rerun with --decode-stride 1 for an estimate)")
     return 0
 
 
-def run_headless_sweep(cap: cv2.VideoCapture, base_settings: dict, duration: float) -> int:
-    total = len(RESOLUTIONS) * len(FPS_OPTIONS) * len(FOURCC_OPTIONS)
-    print(
-        f"[INFO] Starting headless sweep over {total} combinations "
-        f"(~{total * duration:.1f} seconds, duration={duration:.1f}s each)",
-    )
-    header = (
-        "req_res        req_fps  req_fmt  "
-        "act_res        act_fps  act_fmt  "
-        "avg_fps  ema_fps  mbps"
-    )
-    print(header)
-    print("-" * len(header))
+SWEEP_CSV_FIELDS = [
+    "req_width",
+    "req_height",
+    "req_fps",
+    "req_fourcc",
+    "act_width",
+    "act_height",
+    "act_fps",
+    "act_fourcc",
+    "grab_fps",
+    "decoded_fps",
+    "ema_fps",
+    "mbps",
+]
 
-    for width_req, height_req in RESOLUTIONS:
-        for fourcc_req in FOURCC_OPTIONS:
-            if fourcc_req not in ["MJPG"]:
-                continue
 
-            for fps_req in FPS_OPTIONS:
+def run_headless_benchmark_direct(device_index: int, settings: dict, duration: float) -> int:
+    """Headless benchmark over linuxpy's pure-Python V4L2 wrapper.
+
+    Frames are dequeued straight from the kernel-mapped MMAP buffers and
+    requeued without constructing an ndarray or copying pixel data, so the
+    loop measures the driver/USB delivery ceiling rather than OpenCV's
+    per-frame copy + decode path.
+    """
+    width = int(settings.get("width", 1280))
+    height = int(settings.get("height", 720))
+    fps = float(settings.get("fps", 30.0))
+    fourcc = settings.get("fourcc", "MJPG")
+
+    print(f"[INFO] Starting zero-copy headless benchmark for {duration:.1f} seconds")
+
+    frame_count = 0
+    byte_count = 0
+    with V4L2Device.from_id(device_index) as dev:
+        dev.set_format(V4L2BufferType.VIDEO_CAPTURE, width, height, fourcc)
+        try:
+            dev.set_fps(V4L2BufferType.VIDEO_CAPTURE, fps)
+        except OSError:
+            # Some drivers reject VIDIOC_S_PARM; stream at the negotiated rate.
+            pass
+
+        duration_ns = int(duration * 1e9)
+        session_start_ns = time.monotonic_ns()
+        for frame in dev:
+            frame_count += 1
+            byte_count += len(frame)
+            if time.monotonic_ns() - session_start_ns >= duration_ns:
+                break
+        elapsed = (time.monotonic_ns() - session_start_ns) / 1e9
+
+    avg_fps = frame_count / elapsed if elapsed > 0 else 0.0
+    mbps = (byte_count * 8.0) / elapsed / 1e6 if elapsed > 0 else 0.0
+
+    print("[INFO] Zero-copy headless benchmark results:")
+    print(f"  Duration: {elapsed:.3f} s (requested {duration:.3f} s)")
+    print(f"  Frames:   {frame_count}")
+    print(f"  Avg FPS:  {avg_fps:.2f}")
+    print(f"  Data rate: {mbps:.2f} Mbit/s (on-wire, from dequeued buffer sizes)")
+    return 0
+
 
-                if fps_req not in [30.0, 60.0, 120.0]:
-                    continue
+def settle_after_format_change(cap: cv2.VideoCapture, actual: dict, timeout: float = 0.5) -> None:
+    """Discard frames still carrying the previous format.
 
-                settings = dict(base_settings)
-                settings["width"] = width_req
-                settings["height"] = height_req
-                settings["fps"] = float(fps_req)
-                settings["fourcc"] = fourcc_req
+    Some V4L2 drivers keep delivering old-format frames briefly after a
+    STREAMOFF/STREAMON cycle; timing those would corrupt the measurement.
+    """
+    width = actual.get("width", 0)
+    height = actual.get("height", 0)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not cap.grab():
+            return
+        ok, frame = cap.retrieve()
+        if ok and frame.shape[1] == width and frame.shape[0] == height:
+            return
 
-                actual = apply_settings(cap, settings)
-                update_exposure_settings(cap, settings)
 
-                stats = run_headless_benchmark(cap, settings, actual, duration, quiet=True)
-                elapsed = stats["elapsed"]
-                frame_count = stats["frame_count"]
-                avg_fps = stats["avg_fps"]
-                ema_fps = stats["ema_fps"]
-                mbps = stats["mbps"]
+def run_headless_sweep(cap: cv2.VideoCapture, base_settings: dict, duration: float, csv_path: str | None = None, buffer_size: int = 1) -> int:
+    total = len(RESOLUTIONS) * len(SWEEP_FOURCCS) * len(SWEEP_FPS)
+    print(
+        f"[INFO] Starting headless sweep over {total} combinations "
+        f"(~{total * duration:.1f} seconds, duration={duration:.1f}s each)",
+    )
+
+    csv_file = None
+    writer = None
+    if csv_path:
+        csv_file = open(csv_path, "w", newline="")
+        writer = csv.writer(csv_file)
+        writer.writerow(SWEEP_CSV_FIELDS)
+    else:
+        header = (
+            "req_res        req_fps  req_fmt  "
+            "act_res        act_fps  act_fmt  "
+            "grab_fps  dec_fps  ema_fps  mbps"
+        )
+        print(header)
+        print("-" * len(header))
 
-                width_act = actual.get("width", 0)
-                height_act = actual.get("height", 0)
-                fps_act = actual.get("fps", 0.0)
-                fourcc_act = actual.get("fourcc", "????")
+    device_index = int(base_settings.get("device_index", 0))
+    backend = base_settings.get("backend", "v4l2")
 
+    try:
+        for i, ((width_req, height_req), fourcc_req, fps_req) in enumerate(
+            itertools.product(RESOLUTIONS, SWEEP_FOURCCS, SWEEP_FPS)
+        ):
+            settings = dict(base_settings)
+            settings["width"] = width_req
+            settings["height"] = height_req
+            settings["fps"] = float(fps_req)
+            settings["fourcc"] = fourcc_req
+
+            # Changing FOURCC/resolution on a streaming device via cap.set is
+            # flaky (drivers silently keep the old format); a full close and
+            # reopen guarantees each combination negotiates from scratch.
+            cap.release()
+            cap = open_capture(device_index, backend, buffer_size, settings)
+            if not cap.isOpened():
+                print(f"\n[WARN] Failed to reopen camera for {width_req}x{height_req} {fourcc_req}; skipping.")
+                continue
+            if hasattr(cv2, "CAP_PROP_N_THREADS"):
+                cap.set(cv2.CAP_PROP_N_THREADS, max(1, (os.cpu_count() or 2) // 2))
+
+            actual = apply_settings(cap, settings, quiet=True)
+            settle_after_format_change(cap, actual)
+
+            # Two-phase measurement: a pure-grab pass for the physical
+            # ingestion ceiling, then a short decode-every-frame pass so the
+            # row shows whether a mode is USB-bound or CPU-decode-bound.
+            stats = run_headless_benchmark(cap, settings, actual, duration, quiet=True, decode_stride=0)
+            grab_fps = stats["avg_fps"]
+            ema_fps = stats["ema_fps"]
+            mbps = stats["mbps"]
+
+            decode_stats = run_headless_benchmark(
+                cap, settings, actual, min(duration, 3.0), quiet=True, decode_stride=1
+            )
+            decoded_fps = decode_stats["avg_fps"]
+
+            width_act = actual.get("width", 0)
+            height_act = actual.get("height", 0)
+
+            if stats.get("mbps_approx"):
+                # Without a driver-reported bitrate the figure assumes raw
+                # BGR frames; scale that by the decoded rate, not the grab
+                # rate of the compressed stream, which overstates MJPG modes
+                # by orders of magnitude.
+                if width_act > 0 and height_act > 0 and decoded_fps > 0:
+                    mbps = (width_act * height_act * 3 * decoded_fps * 8.0) / 1e6
+                else:
+                    mbps = 0.0
+            fps_act = actual.get("fps", 0.0)
+            fourcc_act = actual.get("fourcc", "????")
+
+            if writer is not None:
+                writer.writerow(
+                    [
+                        width_req,
+                        height_req,
+                        fps_req,
+                        fourcc_req,
+                        width_act,
+                        height_act,
+                        f"{fps_act:.1f}",
+                        fourcc_act,
+                        f"{grab_fps:.2f}",
+                        f"{decoded_fps:.2f}",
+                        f"{ema_fps:.2f}",
+                        f"{mbps:.2f}",
+                    ]
+                )
+                sys.stdout.write(f"\r[INFO] Sweep progress: {i + 1}/{total}")
+                sys.stdout.flush()
+            else:
                 row = (
                     f"{width_req}x{height_req:<9} "
                     f"{fps_req:7.1f} "
@@ -390,11 +921,18 @@ def run_headless_sweep(cap: cv2.VideoCapture, base_settings: dict, duration: flo
                     f"{width_act}x{height_act:<9} "
                     f"{fps_act:7.1f} "
                     f"{fourcc_act:7} "
-                    f"{avg_fps:7.2f} "
+                    f"{grab_fps:8.2f} "
+                    f"{decoded_fps:7.2f} "
                     f"{ema_fps:7.2f} "
                     f"{mbps:7.2f}"
                 )
                 print(row)
+    finally:
+        cap.release()
+        if csv_file is not None:
+            csv_file.close()
+            sys.stdout.write("\n")
+            print(f"[INFO] Sweep results written to {csv_path}")
 
     return 0
 
@@ -428,8 +966,25 @@ def main() -> int:
     settings.setdefault("exposure", None)
     settings.setdefault("gain", None)
 
+    if settings.get("backend", args.backend) == "v4l2-direct":
+        if V4L2Device is None:
+            print("[INFO] linuxpy is not installed; falling back to the v4l2 backend.")
+            settings["backend"] = "v4l2"
+        elif not args.headless or args.sweep:
+            print("[INFO] The v4l2-direct backend only supports plain --headless; falling back to v4l2.")
+            settings["backend"] = "v4l2"
+        else:
+            return run_headless_benchmark_direct(
+                int(settings.get("device_index", args.device)), settings, args.duration
+            )
+
     # Open the camera.
-    cap = open_capture(int(settings.get("device_index", args.device)), settings.get("backend", args.backend))
+    cap = open_capture(
+        int(settings.get("device_index", args.device)),
+        settings.get("backend", args.backend),
+        args.buffer_size,
+        settings,
+    )
     if not cap.isOpened():
         print("[ERROR] Failed to open camera device.")
         return 1
@@ -440,14 +995,14 @@ def main() -> int:
 
     if args.headless and args.sweep:
         try:
-            return run_headless_sweep(cap, settings, args.duration)
+            return run_headless_sweep(cap, settings, args.duration, args.sweep_csv, args.buffer_size)
         finally:
             cap.release()
             cv2.destroyAllWindows()
 
     if args.headless:
         try:
-            return run_headless_benchmark(cap, settings, actual, args.duration)
+            return run_headless_benchmark(cap, settings, actual, args.duration, decode_stride=args.decode_stride)
         finally:
             cap.release()
             cv2.destroyAllWindows()
@@ -456,48 +1011,74 @@ def main() -> int:
     fps_index = find_index(FPS_OPTIONS, int(round(float(settings["fps"]))))
     fmt_index = find_index(FOURCC_OPTIONS, settings.get("fourcc", FOURCC_OPTIONS[0]))
 
-    frame_count = 0
-    session_start = time.monotonic()
-    last_time = session_start
-    ema_fps = 0.0
+    stats_tracker = FrameStats()
+    stats = Stats()
 
     window_name = "Camera Benchmark"
     cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
 
     print_controls()
 
-    try:
-        while True:
-            now = time.monotonic()
-            ret, frame = cap.read()
-            if not ret:
-                print("[WARN] Failed to read frame from camera.")
-                break
-
-            frame_count += 1
-            dt = now - last_time
-            last_time = now
+    grabber = FrameGrabber(cap, stats_tracker)
+    grabber.start()
+    display_interval = 1.0 / DISPLAY_REFRESH_HZ
 
-            inst_fps = 1.0 / dt if dt > 0 else 0.0
-            alpha = 0.1
-            ema_fps = inst_fps if ema_fps == 0.0 else (alpha * inst_fps + (1.0 - alpha) * ema_fps)
-            avg_fps = frame_count / (now - session_start) if now > session_start else 0.0
+    hud_static = build_static_hud_lines(settings, actual)
+    hud_interval = 1.0 / args.hud_hz if args.hud_hz > 0 else 0.0
+    window_visible = True
+    last_visibility_poll = 0.0
+    last_hud_render = 0.0
 
-            height, width = frame.shape[:2]
-            channels = frame.shape[2] if len(frame.shape) == 3 else 1
-            bytes_per_frame = width * height * channels
-            mbps = (bytes_per_frame * ema_fps * 8.0) / 1e6 if ema_fps > 0 else 0.0
+    try:
+        while True:
+            now_ns = time.monotonic_ns()
+            now = now_ns / 1e9
+            frame = grabber.read()
+            if frame is None:
+                if grabber.failed:
+                    print("[WARN] Failed to read frame from camera.")
+                    break
+                continue
 
-            stats = {
-                "frame_count": frame_count,
-                "inst_fps": inst_fps,
-                "ema_fps": ema_fps,
-                "avg_fps": avg_fps,
-                "mbps": mbps,
-            }
+            if stats_tracker.maybe_refresh(now_ns):
+                height, width = frame.shape[:2]
+                channels = frame.shape[2] if len(frame.shape) == 3 else 1
+                bytes_per_frame = width * height * channels
+                ema_fps = stats_tracker.ema_fps
+                mbps = (bytes_per_frame * ema_fps * 8.0) / 1e6 if ema_fps > 0 else 0.0
+
+                stats = Stats(
+                    frame_count=stats_tracker.frame_count,
+                    inst_fps=stats_tracker.inst_fps,
+                    ema_fps=ema_fps,
+                    avg_fps=stats_tracker.avg_fps,
+                    mbps=mbps,
+                )
 
-            vis = overlay_info(frame, stats, settings, actual)
-            cv2.imshow(window_name, vis)
+            # Pushing a 1080p BGR frame to the display server costs ~6 MB per
+            # imshow; skip it entirely while the window is hidden and honor
+            # the --hud-hz cap while it is visible.
+            if now - last_visibility_poll >= 1.0:
+                last_visibility_poll = now
+                try:
+                    vis_prop = cv2.getWindowProperty(window_name, cv2.WND_PROP_VISIBLE)
+                    closed = vis_prop < 1.0 and cv2.getWindowProperty(window_name, cv2.WND_PROP_AUTOSIZE) < 0
+                except cv2.error:
+                    vis_prop = 0.0
+                    closed = True
+                if closed:
+                    # A destroyed window (GTK reports -1, Qt fails the
+                    # lookup) can never deliver a 'q' key, so treat close as
+                    # quit instead of idling forever with imshow suppressed;
+                    # a merely hidden/minimized window still just skips imshow.
+                    print("[INFO] Window closed; exiting.")
+                    break
+                window_visible = vis_prop >= 1.0
+
+            if window_visible and (hud_interval == 0.0 or now - last_hud_render >= hud_interval):
+                last_hud_render = now
+                vis = overlay_info(frame, stats, hud_static)
+                cv2.imshow(window_name, vis)
 
             key = cv2.waitKey(1) & 0xFF
             if key == 27 or key == ord("q"):
@@ -511,57 +1092,56 @@ def main() -> int:
                 new_w, new_h = RESOLUTIONS[res_index]
                 settings["width"] = new_w
                 settings["height"] = new_h
-                actual = apply_settings(cap, settings)
-                update_exposure_settings(cap, settings)
-                frame_count = 0
-                session_start = time.monotonic()
-                last_time = session_start
-                ema_fps = 0.0
+                # Format changes do not touch exposure/gain, so skip those ioctls.
+                with grabber.lock:
+                    actual = apply_settings(cap, settings)
+                stats_tracker.reset()
             elif key == ord("f"):
                 # Cycle target FPS.
                 fps_index = (fps_index + 1) % len(FPS_OPTIONS)
                 new_fps = FPS_OPTIONS[fps_index]
                 settings["fps"] = float(new_fps)
-                actual = apply_settings(cap, settings)
-                update_exposure_settings(cap, settings)
-                frame_count = 0
-                session_start = time.monotonic()
-                last_time = session_start
-                ema_fps = 0.0
+                # Format changes do not touch exposure/gain, so skip those ioctls.
+                with grabber.lock:
+                    actual = apply_settings(cap, settings)
+                stats_tracker.reset()
             elif key == ord("c"):
                 # Cycle pixel format.
                 fmt_index = (fmt_index + 1) % len(FOURCC_OPTIONS)
                 new_fmt = FOURCC_OPTIONS[fmt_index]
                 settings["fourcc"] = new_fmt
-                actual = apply_settings(cap, settings)
-                update_exposure_settings(cap, settings)
-                frame_count = 0
-                session_start = time.monotonic()
-                last_time = session_start
-                ema_fps = 0.0
+                # Format changes do not touch exposure/gain, so skip those ioctls.
+                with grabber.lock:
+                    actual = apply_settings(cap, settings)
+                stats_tracker.reset()
             elif key == ord("a"):
                 mode = settings.get("auto_exposure")
-                if mode == "auto":
-                    cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, AUTO_EXPOSURE_MANUAL)
-                else:
-                    cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, AUTO_EXPOSURE_AUTO)
-                update_exposure_settings(cap, settings)
+                with grabber.lock:
+                    if mode == "auto":
+                        cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, AUTO_EXPOSURE_MANUAL)
+                    else:
+                        cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, AUTO_EXPOSURE_AUTO)
+                    update_exposure_settings(cap, settings)
             elif key == ord("z"):
-                value = cap.get(cv2.CAP_PROP_EXPOSURE)
-                cap.set(cv2.CAP_PROP_EXPOSURE, value - 1.0)
-                update_exposure_settings(cap, settings)
+                with grabber.lock:
+                    value = cap.get(cv2.CAP_PROP_EXPOSURE)
+                    cap.set(cv2.CAP_PROP_EXPOSURE, value - 1.0)
+                    update_exposure_settings(cap, settings)
             elif key == ord("x"):
-                value = cap.get(cv2.CAP_PROP_EXPOSURE)
-                cap.set(cv2.CAP_PROP_EXPOSURE, value + 1.0)
-                update_exposure_settings(cap, settings)
+                with grabber.lock:
+                    value = cap.get(cv2.CAP_PROP_EXPOSURE)
+                    cap.set(cv2.CAP_PROP_EXPOSURE, value + 1.0)
+                    update_exposure_settings(cap, settings)
             elif key == ord("v"):
-                value = cap.get(cv2.CAP_PROP_GAIN)
-                cap.set(cv2.CAP_PROP_GAIN, max(0.0, value - 1.0))
-                update_exposure_settings(cap, settings)
+                with grabber.lock:
+                    value = cap.get(cv2.CAP_PROP_GAIN)
+                    cap.set(cv2.CAP_PROP_GAIN, max(0.0, value - 1.0))
+                    update_exposure_settings(cap, settings)
             elif key == ord("b"):
-                value = cap.get(cv2.CAP_PROP_GAIN)
-                cap.set(cv2.CAP_PROP_GAIN, value + 1.0)
-                update_exposure_settings(cap, settings)
+                with grabber.lock:
+                    value = cap.get(cv2.CAP_PROP_GAIN)
+                    cap.set(cv2.CAP_PROP_GAIN, value + 1.0)
+                    update_exposure_settings(cap, settings)
             elif key == ord("s"):
                 # Save current settings to profile.
                 if not profile_name:
@@ -599,9 +1179,10 @@ def main() -> int:
                         settings = profiles[profile_name]
                         print(f"[INFO] Reloaded profile '{profile_name}' from {profiles_path}")
                         # Re-apply settings and reset stats.
-                        actual = apply_settings(cap, settings)
-                        apply_profile_exposure(cap, settings)
-                        update_exposure_settings(cap, settings)
+                        with grabber.lock:
+                            actual = apply_settings(cap, settings)
+                            apply_profile_exposure(cap, settings)
+                            update_exposure_settings(cap, settings)
                         res_index = find_index(
                             RESOLUTIONS,
                             (int(settings["width"]), int(settings["height"])),
@@ -614,11 +1195,20 @@ def main() -> int:
                             FOURCC_OPTIONS,
                             settings.get("fourcc", FOURCC_OPTIONS[0]),
                         )
-                        frame_count = 0
-                        session_start = time.monotonic()
-                        last_time = session_start
-                        ema_fps = 0.0
+                        stats_tracker.reset()
+
+            if key != 255:
+                # Any handled key may have changed settings or exposure;
+                # refresh the cached HUD lines once per event, not per frame.
+                hud_static = build_static_hud_lines(settings, actual)
+
+            # Pace the GUI loop; the grabber thread keeps capturing at the
+            # camera's native rate in the meantime.
+            sleep_s = display_interval - (time.monotonic() - now)
+            if sleep_s > 0:
+                time.sleep(sleep_s)
     finally:
+        grabber.stop()
         cap.release()
         cv2.destroyAllWindows()
 
@@ -11,11 +11,14 @@ This script helps find the correct color settings by:
 For best results, display a solid color test pattern on your TV.
 """
 
+import argparse
 import requests
 import time
 import io
 import sys
 import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 try:
     from PIL import Image
@@ -25,8 +28,102 @@ except ImportError:
     print("Error: PIL and numpy are required. Install with: pip install pillow numpy")
     sys.exit(1)
 
+# OpenCV is optional; its SIMD mean reduction is ~8x faster than numpy's
+try:
+    import cv2
+    HAS_CV2 = True
+except ImportError:
+    HAS_CV2 = False
+
+# TurboJPEG (libjpeg-turbo) decodes previews with SIMD and writes straight
+# into a numpy array; optional, PIL remains the fallback
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB
+    _turbo = TurboJPEG()
+except Exception:
+    _turbo = None
+
+# Decode at 1/4 scale via libjpeg-turbo's scaled IDCT: the channel means and
+# stds this tooling needs are scale-invariant (well under 1 LSB difference on
+# solid-color calibration targets), and the IDCT work shrinks ~16x.
+_TURBO_SCALE = (1, 4)
+
+def decode_jpeg(data):
+    """Decode JPEG bytes to an RGB numpy array (reduced scale with TurboJPEG)"""
+    if _turbo is not None:
+        return _turbo.decode(data, pixel_format=TJPF_RGB, scaling_factor=_TURBO_SCALE)
+    # load() then asarray() reuses PIL's decoded buffer instead of copying it
+    img = Image.open(io.BytesIO(data))
+    img.load()
+    return np.asarray(img)
+
+def _jpeg_wh(buf):
+    """Width/height straight from the JPEG SOF marker, no decoder involved"""
+    i = 2
+    while i + 9 < len(buf):
+        if buf[i] != 0xFF:
+            break
+        marker = buf[i + 1]
+        seg_len = int.from_bytes(buf[i + 2:i + 4], "big")
+        # SOF0-SOF15 carry the frame size; C4/C8/CC are not SOF markers
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            h = int.from_bytes(buf[i + 5:i + 7], "big")
+            w = int.from_bytes(buf[i + 7:i + 9], "big")
+            return w, h
+        i += 2 + seg_len
+    return None
+
+# Preview dimensions are fixed for a session, so the SOF parse runs once
+_frame_wh = None
+
+def center_crop_rect(w, h, frac=0.2, mcu=16):
+    """MCU-aligned rectangle covering roughly the center `frac` of the frame"""
+    cw = max(mcu, int(w * frac) // mcu * mcu)
+    ch = max(mcu, int(h * frac) // mcu * mcu)
+    x = (w - cw) // 2 // mcu * mcu
+    y = (h - ch) // 2 // mcu * mcu
+    return x, y, cw, ch
+
+def mean_rgb(region):
+    """Average color of an RGB region as an (r, g, b) tuple of ints"""
+    if HAS_CV2:
+        r, g, b, _ = cv2.mean(region)
+        return (int(r), int(g), int(b))
+    # float32 accumulation halves the SIMD lane width vs numpy's default
+    # float64 and still holds channel means exactly at 8-bit precision
+    means = region.reshape(-1, region.shape[-1]).mean(axis=0, dtype=np.float32)
+    return tuple(int(x) for x in means[:3])
+
 BASE_URL = "http://192.168.50.146:8091"
 
+# One keep-alive session for all API calls; avoids a TCP handshake per
+# request. httpx (with its h2 extra) is preferred when installed: against a
+# TLS endpoint it negotiates HTTP/2 via ALPN and multiplexes the concurrent
+# captures over one connection. Over plain http:// (the default BASE_URL)
+# there is no ALPN, so it acts as a pooled HTTP/1.1 client like requests,
+# which remains the fallback.
+try:
+    import httpx
+    SESSION = httpx.Client(
+        timeout=5.0,
+        transport=httpx.HTTPTransport(retries=2, http2=True),
+    )
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+    SESSION = requests.Session()
+    SESSION.mount("http://", requests.adapters.HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=requests.adapters.Retry(total=2, backoff_factor=0.1),
+    ))
+
+CONNECTION_ERRORS = (requests.exceptions.ConnectionError,)
+if HAS_HTTPX:
+    # ConnectTimeout subclasses TimeoutException, not ConnectError, so an
+    # unreachable host needs both to get the friendly message
+    CONNECTION_ERRORS += (httpx.ConnectError, httpx.ConnectTimeout)
+
 # Standard test colors (sRGB values)
 TEST_COLORS = {
     "red": (255, 0, 0),
@@ -39,33 +136,113 @@ TEST_COLORS = {
     "magenta": (255, 0, 255),
 }
 
-def activate_preview():
-    requests.post(f"{BASE_URL}/api/preview/activate")
-    time.sleep(0.5)
+# Sequence identity of the last preview frame seen; lets the wait helper
+# detect a genuinely new frame instead of sleeping a fixed amount
+_last_seq = None
+
+def _note_seq(resp):
+    """Record the frame-identity header from a preview response, if any"""
+    global _last_seq
+    seq = resp.headers.get("X-Frame-Seq") or resp.headers.get("ETag")
+    if seq is not None:
+        _last_seq = seq
+    return seq
+
+def _preview_probe():
+    """(status ok, frame sequence) for the preview endpoint.
+
+    The body is read in full: closing an unread stream makes both urllib3
+    and httpx drop the connection instead of returning it to the pool, so a
+    streamed probe would pay a TCP handshake per 50 ms poll - more than the
+    small preview body costs.
+    """
+    resp = SESSION.get(f"{BASE_URL}/api/preview")
+    return resp.status_code == 200, resp.headers.get("X-Frame-Seq") or resp.headers.get("ETag")
+
+def wait_for_new_frame(timeout=1.0, fallback=0.3, min_frames=1):
+    """Wait until the preview has served min_frames new frames.
+
+    Polls the frame-identity header every 50 ms so the wait ends as soon as
+    fresh frames exist; servers that expose neither X-Frame-Seq nor an ETag
+    get the old blind sleep instead.
+    """
+    global _last_seq
+    if _last_seq is None:
+        time.sleep(fallback)
+        return
+    prev = _last_seq
+    seen = 0
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        ok, seq = _preview_probe()
+        if ok and seq is not None and seq != prev:
+            prev = seq
+            _last_seq = seq
+            seen += 1
+            if seen >= min_frames:
+                return
+        time.sleep(0.05)
 
+def activate_preview():
+    SESSION.post(f"{BASE_URL}/api/preview/activate")
+    # Poll for the first served frame rather than assuming 0.5s is enough
+    deadline = time.monotonic() + 2.0
+    while time.monotonic() < deadline:
+        ok, seq = _preview_probe()
+        if ok:
+            if seq is not None:
+                global _last_seq
+                _last_seq = seq
+            return
+        time.sleep(0.05)
+
+@lru_cache(maxsize=1)
 def get_color_settings():
-    resp = requests.get(f"{BASE_URL}/api/color")
+    """Fetch color settings once per run; nothing else mutates them mid-sweep"""
+    resp = SESSION.get(f"{BASE_URL}/api/color")
     return resp.json()
 
-def set_color_settings(color_space, input_range):
+def set_color_settings(color_space, input_range, base_settings=None):
     """Set color correction settings"""
-    settings = get_color_settings()['settings']
+    if base_settings is None:
+        base_settings = get_color_settings()['settings']
+    settings = dict(base_settings)
     settings['color_space'] = color_space
     settings['input_range'] = input_range
     settings['enabled'] = True
 
-    resp = requests.post(f"{BASE_URL}/api/color", json=settings)
-    time.sleep(0.5)
+    resp = SESSION.post(f"{BASE_URL}/api/color", json=settings)
+    # Wait only until the new settings have reached a served frame
+    wait_for_new_frame(fallback=0.5)
     return resp.status_code == 200
 
 def capture_center_color():
     """Capture a frame and return the average color of the center region"""
-    resp = requests.get(f"{BASE_URL}/api/preview")
+    resp = SESSION.get(f"{BASE_URL}/api/preview")
     if resp.status_code != 200:
         return None
+    _note_seq(resp)
 
-    img = Image.open(io.BytesIO(resp.content))
-    arr = np.array(img)
+    data = resp.content
+
+    if _turbo is not None:
+        # Crop the JPEG losslessly to the center ROI first so the IDCT only
+        # runs over ~4% of the frame instead of all of it
+        try:
+            global _frame_wh
+            if _frame_wh is None:
+                _frame_wh = _jpeg_wh(data)
+            if _frame_wh is not None:
+                width, height = _frame_wh
+            else:
+                width, height, _, _ = _turbo.decode_header(data)
+            x, y, cw, ch = center_crop_rect(width, height)
+            center = _turbo.decode(_turbo.crop(data, x, y, cw, ch), pixel_format=TJPF_RGB)
+            return mean_rgb(center)
+        except Exception:
+            pass  # malformed frame or unsupported transform; decode fully
+
+    arr = decode_jpeg(data)
 
     h, w = arr.shape[:2]
     # Sample center 20% of image
@@ -73,15 +250,7 @@ def capture_center_color():
     margin_w = int(w * 0.4)
     center = arr[margin_h:h-margin_h, margin_w:w-margin_w]
 
-    r = int(center[:,:,0].mean())
-    g = int(center[:,:,1].mean())
-    b = int(center[:,:,2].mean())
-
-    return (r, g, b)
-
-def color_distance(c1, c2):
-    """Calculate Euclidean distance between two RGB colors"""
-    return ((c1[0]-c2[0])**2 + (c1[1]-c2[1])**2 + (c1[2]-c2[2])**2) ** 0.5
+    return mean_rgb(center)
 
 def analyze_color_error(expected, captured):
     """Analyze the color error and suggest corrections"""
@@ -102,59 +271,37 @@ def analyze_color_error(expected, captured):
     elif brightness_ratio > 1.15:
         issues.append("Image appears brighter than expected - try 'Full' input range")
 
-    # Color tint
-    if abs(r_err - g_err) > 15 or abs(r_err - b_err) > 15 or abs(g_err - b_err) > 15:
-        if r_err > g_err and r_err > b_err:
-            issues.append("Red tint detected")
-        elif g_err > r_err and g_err > b_err:
-            issues.append("Green tint detected")
-        elif b_err > r_err and b_err > g_err:
-            issues.append("Blue tint detected")
+    # Color tint: the spread between channel errors says whether one channel
+    # dominates, and argmax picks which - no comparison chain needed
+    errs = np.array([r_err, g_err, b_err])
+    # np.ptp(), not the ndarray method - the latter was removed in NumPy 2.0
+    if np.ptp(errs) > 15:
+        issues.append(f"{('Red', 'Green', 'Blue')[errs.argmax()]} tint detected")
 
         # Matrix mismatch often shows as color tint
         issues.append("Color tint may indicate wrong color matrix - try switching between BT.601 and BT.709")
 
     return issues
 
-def run_calibration():
-    print("=" * 60)
-    print("HyperCalibrate Color Calibration Helper")
-    print("=" * 60)
-
-    print("\nInstructions:")
-    print("1. Display a SOLID COLOR on your TV (e.g., full-screen red, white, etc.)")
-    print("2. This tool will capture what the camera sees")
-    print("3. Compare to find the best color settings")
-    print()
-
-    activate_preview()
-
-    # Test all combinations
-    color_spaces = ["bt601", "bt709"]
-    ranges = ["limited", "full"]
-
+def sweep_combinations(executor, base_settings, samples=3):
+    """Capture the average center color for every color space / range combo"""
     print("Testing all color space / range combinations...")
     print("-" * 60)
 
     results = []
 
-    for cs in color_spaces:
-        for rng in ranges:
-            set_color_settings(cs, rng)
-            time.sleep(0.3)
+    for cs in ["bt601", "bt709"]:
+        for rng in ["limited", "full"]:
+            set_color_settings(cs, rng, base_settings)
+            wait_for_new_frame(fallback=0.3)
 
-            # Capture multiple samples
-            colors = []
-            for _ in range(3):
-                c = capture_center_color()
-                if c:
-                    colors.append(c)
-                time.sleep(0.1)
+            # Capture multiple samples concurrently
+            colors = [c for c in executor.map(lambda _: capture_center_color(), range(samples)) if c]
 
             if colors:
-                avg_r = int(sum(c[0] for c in colors) / len(colors))
-                avg_g = int(sum(c[1] for c in colors) / len(colors))
-                avg_b = int(sum(c[2] for c in colors) / len(colors))
+                # Stack the samples once and reduce all three channels in a
+                # single vectorized mean
+                avg_r, avg_g, avg_b = (int(x) for x in np.array(colors).mean(axis=0))
 
                 result = {
                     "color_space": cs,
@@ -165,11 +312,10 @@ def run_calibration():
 
                 print(f"{cs.upper():6} + {rng.upper():7}: RGB({avg_r:3}, {avg_g:3}, {avg_b:3})")
 
-    print("\n" + "=" * 60)
-    print("ANALYSIS")
-    print("=" * 60)
+    return results
 
-    # Ask user what color they're displaying
+def prompt_expected_color():
+    """Interactively ask which color the TV is displaying"""
     print("\nWhat color is currently displayed on your TV?")
     print("Options: red, green, blue, white, gray50, yellow, cyan, magenta")
     print("Or enter custom RGB as 'R,G,B' (e.g., '255,128,0')")
@@ -181,40 +327,51 @@ def run_calibration():
         user_input = "white"
 
     if user_input in TEST_COLORS:
-        expected = TEST_COLORS[user_input]
-    elif ',' in user_input:
+        return TEST_COLORS[user_input]
+    if ',' in user_input:
         try:
             parts = user_input.split(',')
-            expected = (int(parts[0]), int(parts[1]), int(parts[2]))
+            return (int(parts[0]), int(parts[1]), int(parts[2]))
         except:
             print("Invalid RGB format, using white")
-            expected = TEST_COLORS["white"]
-    else:
-        print("Unknown color, using white")
-        expected = TEST_COLORS["white"]
+            return TEST_COLORS["white"]
+    print("Unknown color, using white")
+    return TEST_COLORS["white"]
+
+def calibrate_one(executor, base_settings, expected, samples=3, apply_best=True):
+    """Sweep all combos against one expected color and report the best match"""
+    results = sweep_combinations(executor, base_settings, samples)
+
+    print("\n" + "=" * 60)
+    print("ANALYSIS")
+    print("=" * 60)
 
     print(f"\nExpected color: RGB{expected}")
     print("-" * 40)
 
-    # Find best match
+    # Find best match - one vectorized distance pass over all combos
     best_result = None
     best_distance = float('inf')
 
-    for result in results:
-        dist = color_distance(expected, result["captured"])
-        result["distance"] = dist
-        result["error"] = (
-            result["captured"][0] - expected[0],
-            result["captured"][1] - expected[1],
-            result["captured"][2] - expected[2],
-        )
+    if results:
+        # int32: a squared channel error can reach 255^2, which overflows
+        # int16 and would make argmin pick the worst combination
+        captured = np.array([r["captured"] for r in results], dtype=np.int32)
+        diffs = captured - np.array(expected, dtype=np.int32)
+        sq_dists = (diffs * diffs).sum(axis=1)
+        dists = np.sqrt(sq_dists)
 
-        print(f"{result['color_space'].upper():6} + {result['input_range'].upper():7}: "
-              f"RGB{result['captured']} - Error: {result['error']} - Distance: {dist:.1f}")
+        for result, dist, diff in zip(results, dists, diffs):
+            result["distance"] = float(dist)
+            result["error"] = tuple(int(x) for x in diff)
 
-        if dist < best_distance:
-            best_distance = dist
-            best_result = result
+            print(f"{result['color_space'].upper():6} + {result['input_range'].upper():7}: "
+                  f"RGB{result['captured']} - Error: {result['error']} - Distance: {dist:.1f}")
+
+        # sqrt is monotonic, so pick the minimum on the squared distances
+        best_idx = int(sq_dists.argmin())
+        best_result = results[best_idx]
+        best_distance = float(dists[best_idx])
 
     print("\n" + "=" * 60)
     print("RECOMMENDATION")
@@ -231,10 +388,11 @@ def run_calibration():
         else:
             print("   ⚠️  Large color error - check your source device settings")
 
-        # Apply best settings
-        print(f"\nApplying recommended settings...")
-        set_color_settings(best_result['color_space'], best_result['input_range'])
-        print("Done!")
+        if apply_best:
+            # Apply best settings
+            print(f"\nApplying recommended settings...")
+            set_color_settings(best_result['color_space'], best_result['input_range'], base_settings)
+            print("Done!")
 
         # Analyze remaining error
         issues = analyze_color_error(expected, best_result['captured'])
@@ -243,6 +401,96 @@ def run_calibration():
             for issue in issues:
                 print(f"  - {issue}")
 
+    return {
+        "expected": list(expected),
+        "results": results,
+        "best": best_result,
+    }
+
+def _rgb_triplet(text):
+    """argparse type for an 'R,G,B' triplet of 0-255 integers"""
+    parts = text.split(',')
+    if len(parts) != 3:
+        raise argparse.ArgumentTypeError(f"expected R,G,B, got {text!r}")
+    try:
+        rgb = tuple(int(p) for p in parts)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected integer R,G,B, got {text!r}")
+    if not all(0 <= v <= 255 for v in rgb):
+        raise argparse.ArgumentTypeError(f"channel values must be 0-255, got {text!r}")
+    return rgb
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Find the best color space / input range for a displayed test color")
+    which = parser.add_mutually_exclusive_group()
+    which.add_argument("--expected", metavar="R,G,B", type=_rgb_triplet,
+                       help="expected color as comma-separated RGB (e.g. 255,128,0)")
+    which.add_argument("--colors", metavar="NAME",
+                       help="named test color to calibrate against, or 'all' to sweep "
+                            f"every test color ({', '.join(TEST_COLORS)})")
+    parser.add_argument("--samples", type=int, default=3,
+                        help="preview captures per combination (default: 3)")
+    parser.add_argument("--no-apply", action="store_true",
+                        help="report the best match without applying it")
+    parser.add_argument("--json", action="store_true",
+                        help="print results as JSON at the end")
+    return parser.parse_args()
+
+def run_calibration(args):
+    print("=" * 60)
+    print("HyperCalibrate Color Calibration Helper")
+    print("=" * 60)
+
+    print("\nInstructions:")
+    print("1. Display a SOLID COLOR on your TV (e.g., full-screen red, white, etc.)")
+    print("2. This tool will capture what the camera sees")
+    print("3. Compare to find the best color settings")
+    print()
+
+    activate_preview()
+
+    # The combos themselves must run serially (each one mutates server
+    # state), but the samples within a combo are independent HTTP GETs
+    # and can be in flight together.
+    executor = ThreadPoolExecutor(max_workers=3)
+
+    # Fetch the current settings once; each combo only overrides
+    # color_space/input_range, so re-fetching per POST is a wasted RTT
+    base_settings = get_color_settings()['settings']
+
+    apply_best = not args.no_apply
+
+    if args.colors == "all":
+        # Unattended sweep over every test color: one process, one session,
+        # one preview activation for all eight calibrations
+        reports = []
+        for name, expected in TEST_COLORS.items():
+            print(f"\n>>> Display '{name}' RGB{expected} on your TV now...")
+            time.sleep(3.0)
+            report = calibrate_one(executor, base_settings, expected,
+                                   args.samples, apply_best=False)
+            report["color"] = name
+            reports.append(report)
+        if args.json:
+            print(json.dumps(reports, indent=2))
+    else:
+        if args.expected:
+            expected = args.expected
+        elif args.colors:
+            if args.colors not in TEST_COLORS:
+                print(f"Unknown color '{args.colors}' - "
+                      f"choose from: {', '.join(TEST_COLORS)}")
+                sys.exit(1)
+            expected = TEST_COLORS[args.colors]
+        else:
+            expected = prompt_expected_color()
+
+        report = calibrate_one(executor, base_settings, expected,
+                               args.samples, apply_best)
+        if args.json:
+            print(json.dumps(report, indent=2))
+
     print("\n" + "=" * 60)
     print("Tips for better color accuracy:")
     print("-" * 60)
@@ -254,8 +502,8 @@ def run_calibration():
 
 if __name__ == "__main__":
     try:
-        run_calibration()
-    except requests.exceptions.ConnectionError:
+        run_calibration(parse_args())
+    except CONNECTION_ERRORS:
         print("❌ Could not connect to HyperCalibrate at", BASE_URL)
         sys.exit(1)
     except KeyboardInterrupt: